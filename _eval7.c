@@ -0,0 +1,250 @@
+/*
+ * CactusKev 7-card hand evaluator.
+ *
+ * Cards use the 32-bit CactusKev layout that treys.Card.new() returns:
+ *
+ *     xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp
+ *
+ * (b = rank bit, cdhs = suit bit, r = rank, p = rank prime). Ranks match
+ * treys: 1 = royal flush ... 7462 = 7-high. The 7462-class tables are
+ * generated once at import time.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <stdlib.h>
+
+#define NUM_PAIRED 4888 /* quads + full houses + trips + two pair + pair */
+
+static const int PRIMES[13] = {2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41};
+
+/* Straights from broadway down to the wheel, as 13-bit rank masks */
+static const int STRAIGHTS[10] = {
+    0x1F00, 0xF80, 0x7C0, 0x3E0, 0x1F0, 0xF8, 0x7C, 0x3E, 0x1F, 0x100F
+};
+
+static uint16_t flushes[8192];
+static uint16_t unique5[8192];
+
+typedef struct {
+    uint32_t product;
+    uint16_t rank;
+} paired_entry;
+
+static paired_entry paired[NUM_PAIRED];
+static int num_paired = 0;
+
+static const int COMBOS[21][5] = {
+    {0, 1, 2, 3, 4}, {0, 1, 2, 3, 5}, {0, 1, 2, 3, 6}, {0, 1, 2, 4, 5},
+    {0, 1, 2, 4, 6}, {0, 1, 2, 5, 6}, {0, 1, 3, 4, 5}, {0, 1, 3, 4, 6},
+    {0, 1, 3, 5, 6}, {0, 1, 4, 5, 6}, {0, 2, 3, 4, 5}, {0, 2, 3, 4, 6},
+    {0, 2, 3, 5, 6}, {0, 2, 4, 5, 6}, {0, 3, 4, 5, 6}, {1, 2, 3, 4, 5},
+    {1, 2, 3, 4, 6}, {1, 2, 3, 5, 6}, {1, 2, 4, 5, 6}, {1, 3, 4, 5, 6},
+    {2, 3, 4, 5, 6}
+};
+
+/* ---- Table generation ---- */
+
+static int popcount13(int bits)
+{
+    int n = 0;
+    for (; bits; bits &= bits - 1)
+        n++;
+    return n;
+}
+
+static int is_straight(int bits)
+{
+    for (int i = 0; i < 10; i++)
+        if (STRAIGHTS[i] == bits)
+            return 1;
+    return 0;
+}
+
+static void add_paired(uint32_t product, uint16_t rank)
+{
+    paired[num_paired].product = product;
+    paired[num_paired].rank = rank;
+    num_paired++;
+}
+
+static int compare_paired(const void *a, const void *b)
+{
+    uint32_t x = ((const paired_entry *)a)->product;
+    uint32_t y = ((const paired_entry *)b)->product;
+    return (x > y) - (x < y);
+}
+
+static void build_tables(void)
+{
+    /* Straight flushes 1-10, straights 1600-1609 */
+    for (int i = 0; i < 10; i++) {
+        flushes[STRAIGHTS[i]] = (uint16_t)(1 + i);
+        unique5[STRAIGHTS[i]] = (uint16_t)(1600 + i);
+    }
+
+    /* Flushes 323-1599, high cards 6186-7462: a larger rank mask is
+     * always the stronger hand, so walk the masks downwards. */
+    uint16_t flush_rank = 323, high_rank = 6186;
+    for (int bits = 8191; bits > 0; bits--) {
+        if (popcount13(bits) != 5 || is_straight(bits))
+            continue;
+        flushes[bits] = flush_rank++;
+        unique5[bits] = high_rank++;
+    }
+
+    /* Quads 11-166 */
+    uint16_t rank = 11;
+    for (int q = 12; q >= 0; q--)
+        for (int k = 12; k >= 0; k--)
+            if (k != q)
+                add_paired((uint32_t)(PRIMES[q] * PRIMES[q] * PRIMES[q] * PRIMES[q] * PRIMES[k]), rank++);
+
+    /* Full houses 167-322 */
+    for (int t = 12; t >= 0; t--)
+        for (int p = 12; p >= 0; p--)
+            if (p != t)
+                add_paired((uint32_t)(PRIMES[t] * PRIMES[t] * PRIMES[t] * PRIMES[p] * PRIMES[p]), rank++);
+
+    /* Trips 1610-2467 */
+    rank = 1610;
+    for (int t = 12; t >= 0; t--)
+        for (int k1 = 12; k1 >= 0; k1--)
+            for (int k2 = k1 - 1; k2 >= 0; k2--)
+                if (k1 != t && k2 != t)
+                    add_paired((uint32_t)(PRIMES[t] * PRIMES[t] * PRIMES[t] * PRIMES[k1] * PRIMES[k2]), rank++);
+
+    /* Two pair 2468-3325 */
+    for (int p1 = 12; p1 >= 0; p1--)
+        for (int p2 = p1 - 1; p2 >= 0; p2--)
+            for (int k = 12; k >= 0; k--)
+                if (k != p1 && k != p2)
+                    add_paired((uint32_t)(PRIMES[p1] * PRIMES[p1] * PRIMES[p2] * PRIMES[p2] * PRIMES[k]), rank++);
+
+    /* One pair 3326-6185 */
+    for (int p = 12; p >= 0; p--)
+        for (int k1 = 12; k1 >= 0; k1--)
+            for (int k2 = k1 - 1; k2 >= 0; k2--)
+                for (int k3 = k2 - 1; k3 >= 0; k3--)
+                    if (k1 != p && k2 != p && k3 != p)
+                        add_paired((uint32_t)(PRIMES[p] * PRIMES[p] * PRIMES[k1] * PRIMES[k2] * PRIMES[k3]), rank++);
+
+    qsort(paired, num_paired, sizeof(paired_entry), compare_paired);
+}
+
+/* ---- Evaluation ---- */
+
+static uint16_t eval5(uint32_t c0, uint32_t c1, uint32_t c2, uint32_t c3, uint32_t c4)
+{
+    /* Mask to the 13 rank bits so junk input can't index past the tables */
+    int q = (int)((c0 | c1 | c2 | c3 | c4) >> 16) & 0x1FFF;
+
+    if (c0 & c1 & c2 & c3 & c4 & 0xF000)
+        return flushes[q];
+    if (unique5[q])
+        return unique5[q];
+
+    uint32_t product = (c0 & 0xFF) * (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF);
+    int lo = 0, hi = num_paired - 1;
+    while (lo <= hi) {
+        int mid = (lo + hi) / 2;
+        if (paired[mid].product == product)
+            return paired[mid].rank;
+        if (paired[mid].product < product)
+            lo = mid + 1;
+        else
+            hi = mid - 1;
+    }
+    return 0; /* not a hand: invalid or duplicate cards */
+}
+
+/* Best rank over the 21 five-card subsets, or 0 if any subset is not a
+ * hand (rank 0 would otherwise beat a royal flush). */
+static uint16_t eval7_cards(const uint32_t cards[7])
+{
+    uint16_t best = 7463;
+    for (int i = 0; i < 21; i++) {
+        const int *c = COMBOS[i];
+        uint16_t score = eval5(cards[c[0]], cards[c[1]], cards[c[2]], cards[c[3]], cards[c[4]]);
+        if (score == 0)
+            return 0;
+        if (score < best)
+            best = score;
+    }
+    return best;
+}
+
+/* ---- Python binding ---- */
+
+/* Exactly the layout treys.Card.new() produces for one of the 52 cards */
+static int valid_card(uint32_t card)
+{
+    uint32_t r = (card >> 8) & 0xF;
+    uint32_t suit = (card >> 12) & 0xF;
+    return r < 13
+        && card == ((1u << (16 + r)) | (suit << 12) | (r << 8) | (uint32_t)PRIMES[r])
+        && (suit == 1 || suit == 2 || suit == 4 || suit == 8);
+}
+
+static PyObject *py_eval7(PyObject *self, PyObject *arg)
+{
+    PyObject *seq = PySequence_Fast(arg, "eval7() expects a sequence of 7 card ints");
+    if (seq == NULL)
+        return NULL;
+
+    if (PySequence_Fast_GET_SIZE(seq) != 7) {
+        Py_DECREF(seq);
+        PyErr_SetString(PyExc_ValueError, "eval7() expects exactly 7 cards");
+        return NULL;
+    }
+
+    uint32_t cards[7];
+    PyObject **items = PySequence_Fast_ITEMS(seq);
+    for (int i = 0; i < 7; i++) {
+        unsigned long card = PyLong_AsUnsignedLong(items[i]);
+        if (card == (unsigned long)-1 && PyErr_Occurred()) {
+            Py_DECREF(seq);
+            return NULL;
+        }
+        cards[i] = (uint32_t)card;
+    }
+    Py_DECREF(seq);
+
+    /* Treys raises on bad boards; never hand back a rank for one */
+    for (int i = 0; i < 7; i++) {
+        int ok = valid_card(cards[i]);
+        for (int j = 0; ok && j < i; j++)
+            ok = cards[j] != cards[i];
+        if (!ok) {
+            PyErr_SetString(PyExc_ValueError, "eval7() got invalid or duplicate cards");
+            return NULL;
+        }
+    }
+
+    uint16_t rank = eval7_cards(cards);
+    if (rank == 0) {
+        PyErr_SetString(PyExc_ValueError, "eval7() got invalid or duplicate cards");
+        return NULL;
+    }
+    return PyLong_FromLong(rank);
+}
+
+static PyMethodDef methods[] = {
+    {"eval7", py_eval7, METH_O,
+     "eval7(cards) -> int\n\n"
+     "Rank of the best 5-card hand among 7 treys card ints\n"
+     "(1 = royal flush ... 7462 = 7-high). Raises ValueError when\n"
+     "the cards do not form a hand."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT, "_eval7", "CactusKev 7-card hand evaluator.", -1, methods
+};
+
+PyMODINIT_FUNC PyInit__eval7(void)
+{
+    if (num_paired == 0)
+        build_tables();
+    return PyModule_Create(&module);
+}
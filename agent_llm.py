@@ -1,12 +1,33 @@
 from email import message_from_string
-from openai import OpenAI
-import json
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from pydantic import BaseModel, ConfigDict
+from typing import Literal
+import asyncio
+import collections
+import httpx
+import math
 import os
+import string
 from dotenv import load_dotenv
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# One keep-alive HTTP/2 pool for the whole process: TLS handshakes are
+# paid once and concurrent matches multiplex over the same connections.
+# DefaultAsyncHttpxClient keeps the SDK's defaults (redirects etc.); close
+# it through client.close() once the run is over.
+http_client = DefaultAsyncHttpxClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+# Requests-per-minute allowed by the account tier. Every in-flight
+# completion holds one slot, so concurrent matches can't blow the limit.
+RATE_LIMIT_QPM = int(os.getenv("OPENAI_RATE_LIMIT_QPM", "500"))
+request_slots = asyncio.Semaphore(max(1, RATE_LIMIT_QPM // 60))
 
 # ============================
 # SYSTEM STRATEGY PROMPT
@@ -15,9 +36,7 @@ SYSTEM_PROMPT = """
 You are an autonomous poker agent playing Heads-Up No-Limit Texas Hold’em. 
 Your job is to ALWAYS choose a strategically strong legal action AND a valid amount.
 
-==============================
 ### ABSOLUTE ACTION RULES
-==============================
 1. NEVER fold preflop unless your hand is extremely weak *and* opponent has raised.
 2. If legal_actions contains "raise":
    - Use this formula for raise amount:
@@ -32,9 +51,7 @@ Your job is to ALWAYS choose a strategically strong legal action AND a valid amo
 6. If "allin" is legal:
    Go all-in ONLY with: top pair good kicker, overpairs, 2-pair+, strong draws (≥12 outs).
 
-==============================
 ### STRATEGIC FRAMEWORK
-==============================
 PRE-FLOP RANGES:
 - Raise with: Any Ace, any King, any Queen, any Jack, any pair, any suited connector (54s+), any two broadways.
 - Call with: 65o+, most suited hands, one-gappers, medium offsuit hands.
@@ -47,83 +64,279 @@ POST-FLOP:
 - Check marginal hands.
 - Fold weak air vs aggression.
 
-==============================
-### MATH CONSTRAINTS (IMPORTANT)
-==============================
-- ALL bet/raise amounts must be integers.
-- Amount must NEVER exceed your stack.
-- Amount must NEVER be negative.
-- If amount isn't needed (fold/check/call), set amount = 0.
+### AMOUNT
+- Never more than your stack, never negative.
+- 0 for fold/check/call.
 
-==============================
 ### OUTPUT FORMAT
-==============================
-Return ONLY:
-{"action": "<action>", "amount": <int>}
-
-No reasoning.
-No commentary.
-No words outside the JSON.
+JSON: {"action": "<action>", "amount": <int>}
 """
 
+# Built once and shared by every request: provider prefix caches only hit
+# when the system block is byte-identical, so never rebuild it per call.
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# ============================
+# STRUCTURED OUTPUT
+# ============================
+class ActionDecision(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    action: Literal["fold", "call", "check", "bet", "raise", "allin"]
+    amount: int
+
+
+# Models that accept a strict JSON schema; anything else gets plain JSON mode.
+# Listed by exact name: older snapshots behind the same prefixes
+# (gpt-4o-2024-05-13, o1-mini, o1-preview) reject json_schema.
+STRUCTURED_OUTPUT_MODELS = {
+    "gpt-4o", "gpt-4o-2024-08-06", "gpt-4o-2024-11-20",
+    "gpt-4o-mini", "gpt-4o-mini-2024-07-18",
+    "o1", "o1-2024-12-17",
+    "o3", "o3-2025-04-16", "o3-mini", "o3-mini-2025-01-31",
+    "o4-mini", "o4-mini-2025-04-16",
+}
+# Families where every released snapshot supports it
+STRUCTURED_OUTPUT_PREFIXES = ("gpt-4.1", "gpt-5")
+
+# Reasoning models reject temperature and sample non-deterministically
+REASONING_MODEL_PREFIXES = ("o1", "o3", "o4", "gpt-5")
+
+JSON_SCHEMA_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "action_decision",
+        "strict": True,
+        "schema": ActionDecision.model_json_schema(),
+    },
+}
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+# ============================
+# USER PROMPT SKELETON
+# ============================
+# $pid is filled once per agent; the rest per decision.
+USER_PROMPT = string.Template("""
+GAME STATE:
+
+Phase: $phase
+Your ID: $pid
+
+Your Hole Cards: $hole_cards
+Community Cards: $community_cards
+
+Pot: ${pot_in_bb}bb
+Players: $players
+LEGAL ACTIONS: $legal_actions
+
+Your Stack: $my_stack chips
+
+To-Call amount: $to_call chips
+
+Return JSON only.
+""")
+
+# Max remembered decisions per agent before LRU eviction
+RESPONSE_CACHE_SIZE = 1024
+
+
+def bucket(value: int) -> int:
+    # Geometric ~10% buckets so near-identical stacks/pots share a cache key
+    if value <= 0:
+        return 0
+    return 1 + round(math.log(value, 1.1))
+
+
 # ============================
 # AGENT CLASS
 # ============================
 class AgentLLM:
-    def __init__(self, model_name: str, player_id: str):
+    def __init__(self, model_name: str, player_id: str, semantic_cache=None, big_blind: int = 10,
+                 response_cache=None):
         self.model = model_name
         self.player_id = player_id
+        self.big_blind = big_blind
+        self._prompt_tmpl = string.Template(
+            USER_PROMPT.safe_substitute(pid=player_id.replace("$", "$$"))
+        )
+        # Optional semantic_cache.SemanticCache, shared by agents on one model
+        self.semantic_cache = semantic_cache
 
-    def decide(self, state: dict, legal_actions: list[str]):
+        self.response_format = (
+            JSON_SCHEMA_FORMAT
+            if model_name in STRUCTURED_OUTPUT_MODELS or model_name.startswith(STRUCTURED_OUTPUT_PREFIXES)
+            else JSON_OBJECT_FORMAT
+        )
 
-        # USER PROMPT fed to LLM every decision
-        prompt = f"""
-GAME STATE:
+        # Per-model request options, fixed for the agent's lifetime.
+        # Reasoning models (o1/o3/o4/gpt-5) DO NOT support temperature;
+        # GPT-4o and 4o-mini do.
+        self._extra_kwargs = {"response_format": self.response_format}
+        if not model_name.startswith(REASONING_MODEL_PREFIXES):
+            self._extra_kwargs["temperature"] = 0
 
-Phase: {state['phase']}
-Your ID: {self.player_id}
+        # state key -> (action, amount as a fraction of stack), LRU ordered.
+        # Pass one OrderedDict per (player_id, model) to share it across
+        # matches. Only deterministic (temperature=0) models reuse answers.
+        self._cache = collections.OrderedDict() if response_cache is None else response_cache
+        self._cacheable = self._extra_kwargs.get("temperature") == 0
 
-Your Hole Cards: {state['your_hole_cards']}
-Community Cards: {state['community_cards']}
+    def _cache_key(self, state: dict, legal_actions: list[str], stack: int, to_call: int):
+        return (
+            self.player_id,
+            self.model,
+            tuple(sorted(state['your_hole_cards'])),
+            tuple(state['community_cards']),
+            bucket(state['total_pot']),
+            bucket(stack),
+            bucket(to_call),
+            tuple(legal_actions),
+        )
 
-Pot: {state['total_pot']}
-Players: {state['players']}
-LEGAL ACTIONS: {legal_actions}
+    def _remember(self, key, action: str, amount: int, stack: int):
+        self._cache[key] = (action, amount / stack if stack else 0)
+        self._cache.move_to_end(key)
+        if len(self._cache) > RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
 
-Your Stack: {[p for p in state['players'] if p['player_id']==self.player_id][0]['stack']}
+    def _position(self, state: dict):
+        # (my stack, amount I must call) in one pass over the player list;
+        # the helpers below take it precomputed and only fall back to this
+        # when called on their own (Batch API mode)
+        highest = 0
+        for p in state['players']:
+            if p['committed'] > highest:
+                highest = p['committed']
+            if p['player_id'] == self.player_id:
+                me = p
+        return me['stack'], highest - me['committed']
 
-To-Call amount: {max(pl['committed'] for pl in state['players']) - [p['committed'] for p in state['players'] if p['player_id']==self.player_id][0]}
+    def _semantic_spot(self, state: dict, legal_actions: list[str], stack: int, to_call: int):
+        # Semantic cache inputs: the exact part of the spot (only equal keys
+        # are ever compared), the table numbers that get embedded, and the
+        # full text shown to the verifier. Numbers stay in real units (bb):
+        # the verifier has to judge them as amounts.
+        hole = tuple(sorted(state['your_hole_cards']))
+        board = tuple(state['community_cards'])
+        key = (state['phase'], hole, board, tuple(legal_actions))
+        bb = self.big_blind
+        numbers = (
+            f"stack:{stack / bb:.1f}bb|pot:{state['total_pot'] / bb:.1f}bb|to_call:{to_call / bb:.1f}bb"
+        )
+        descriptor = "|".join([state['phase'], " ".join(hole), " ".join(board), ",".join(legal_actions), numbers])
+        return key, numbers, descriptor
 
-Return JSON only.
-"""
+    def cached_decision(self, state: dict, legal_actions: list[str], position=None):
+        """Cached (action, amount) for this spot, scaled to the current
+        stack, or None if the model has to be asked."""
+        if not self._cacheable:
+            return None
+        my_stack, to_call = position or self._position(state)
+        key = self._cache_key(state, legal_actions, my_stack, to_call)
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        action, fraction = self._cache[key]
+        return action, min(my_stack, round(fraction * my_stack))
+
+    def request_body(self, state: dict, legal_actions: list[str], position=None) -> dict:
+        """Chat-completions request for this decision (live or Batch API)."""
+        # Table numbers go in coarse units (big blinds, share of pot) so
+        # near-identical spots produce identical prompts; only our own
+        # stack and to-call stay exact, since amounts are sized from them.
+        my_stack, to_call = position or self._position(state)
+        pot = state['total_pot']
+        players = [
+            {
+                "player_id": p['player_id'],
+                "stack": f"{round(p['stack'] / self.big_blind)}bb",
+                "pot_share": round(p['committed'] / pot, 1) if pot else 0.0,
+                "is_folded": p['is_folded'],
+                "is_all_in": p['is_all_in']
+            }
+            for p in state['players']
+        ]
+
+        # USER PROMPT fed to LLM every decision
+        prompt = self._prompt_tmpl.substitute(
+            phase=state['phase'],
+            hole_cards=state['your_hole_cards'],
+            community_cards=state['community_cards'],
+            pot_in_bb=round(pot / self.big_blind),
+            players=players,
+            legal_actions=legal_actions,
+            my_stack=my_stack,
+            to_call=to_call,
+        )
 
         messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            SYSTEM_MESSAGE,
             {"role": "user", "content": prompt}
         ]
 
-        if self.model.startswith("o3"):
-            # o3 models DO NOT support temperature or max tokens
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=messages
-            )
-        else:
-            # GPT-4o and 4o-mini DO support temperature
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0
-            )
+        return {"model": self.model, "messages": messages, **self._extra_kwargs}
+
+    def record_response(self, state: dict, legal_actions: list[str], content: str | None, position=None):
+        """Parse the model's reply into (action, amount) and cache it.
+        JSON mode guarantees the shape, so a refusal (no content) or a
+        pydantic.ValidationError is a real failure: both raise ValueError
+        for the caller to end the match on, rather than being papered over."""
+        if content is None:
+            raise ValueError(f"{self.model} returned no content (refusal)")
+        decision = ActionDecision.model_validate_json(content)
+        action, amount = decision.action, decision.amount
 
+        if self._cacheable:
+            my_stack, to_call = position or self._position(state)
+            self._remember(self._cache_key(state, legal_actions, my_stack, to_call), action, amount, my_stack)
+        return action, amount
 
-        # Extract model output
-        content = response.choices[0].message.content.strip()
+    async def _embed(self, text: str):
+        # Embedding calls count against the rate limit too
+        async with request_slots:
+            return await self.semantic_cache.embed(text)
+
+    async def decide(self, state: dict, legal_actions: list[str]):
+        # One pass over the players per decision, shared by every step below
+        position = self._position(state)
+        my_stack, to_call = position
+        cached = self.cached_decision(state, legal_actions, position)
+        if cached is not None:
+            return cached
+
+        # Reusing neighbours is only sound for deterministic models
+        use_semantic = self.semantic_cache is not None and self._cacheable
+        vec = embedding = None
+        if use_semantic:
+            key, numbers, descriptor = self._semantic_spot(state, legal_actions, my_stack, to_call)
+            if key in self.semantic_cache:
+                vec = await self._embed(numbers)
+                # lookup() may ask the verifier model
+                async with request_slots:
+                    similar = await self.semantic_cache.lookup(key, descriptor, vec)
+                if similar is not None:
+                    action, fraction = similar
+                    return action, min(my_stack, round(fraction * my_stack))
+            else:
+                # Nothing to compare against yet: the vector is only needed
+                # for add(), so fetch it alongside the completion
+                embedding = asyncio.create_task(self._embed(numbers))
 
-        # Parse JSON or fallback
         try:
-            data = json.loads(content)
-            return data["action"], data.get("amount", 0)
-        except Exception:
-            # fallback strategy – safe default
-            return "check" if "check" in legal_actions else "fold", 0
+            async with request_slots:
+                response = await client.chat.completions.create(**self.request_body(state, legal_actions, position))
+
+            # Extract model output
+            action, amount = self.record_response(
+                state, legal_actions, response.choices[0].message.content, position
+            )
+        except BaseException:
+            if embedding is not None:
+                embedding.cancel()
+            raise
+
+        if use_semantic:
+            if vec is None:
+                vec = await embedding
+            self.semantic_cache.add(key, descriptor, vec, action, amount / my_stack if my_stack else 0)
+        return action, amount
@@ -0,0 +1,150 @@
+import numba
+import numpy as np
+
+from treys import Card
+from treys.lookup import LookupTable
+
+# ---- Card encoding ----
+# A card is a uint8: rank (0-12, "2".."A") in the high bits, suit (0-3,
+# "cdhs") in the low two bits. _CACTUS maps that code to the 32-bit
+# CactusKev/Treys layout the evaluator below works on.
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+_CACTUS = np.zeros(64, dtype=np.int64)
+for _r, _rank in enumerate(RANKS):
+    for _s, _suit in enumerate(SUITS):
+        _CACTUS[_r << 2 | _s] = Card.new(_rank + _suit)
+
+
+def encode(card: str) -> int:
+    return RANKS.index(card[0]) << 2 | SUITS.index(card[1])
+
+
+def encode_cards(cards: list[str]) -> np.ndarray:
+    return np.array([encode(c) for c in cards], dtype=np.uint8)
+
+
+# ---- CactusKev lookup tables ----
+# Built once from the Treys tables so ranks agree exactly with
+# evaluator.evaluate(): 1 = royal flush ... 7462 = 7-high.
+def _build_tables():
+    table = LookupTable()
+    flushes = np.zeros(8192, dtype=np.uint16)
+    unique5 = np.zeros(8192, dtype=np.uint16)
+
+    for bits in range(8192):
+        if bin(bits).count("1") != 5:
+            continue
+        prime = Card.prime_product_from_rankbits(bits)
+        flushes[bits] = table.flush_lookup[prime]
+        unique5[bits] = table.unsuited_lookup[prime]
+
+    # Hands with a repeated rank: resolved by prime product, binary search
+    distinct = {int(Card.prime_product_from_rankbits(b)) for b in range(8192) if bin(b).count("1") == 5}
+    paired = sorted((p, r) for p, r in table.unsuited_lookup.items() if p not in distinct)
+    products = np.array([p for p, _ in paired], dtype=np.int64)
+    values = np.array([r for _, r in paired], dtype=np.uint16)
+    return flushes, unique5, products, values
+
+
+_FLUSHES, _UNIQUE5, _PRODUCTS, _VALUES = _build_tables()
+
+# The 21 ways to pick 5 of 7 cards
+_COMBOS = np.array([
+    [i, j, k, l, m]
+    for i in range(7) for j in range(i + 1, 7) for k in range(j + 1, 7)
+    for l in range(k + 1, 7) for m in range(l + 1, 7)
+], dtype=np.int64)
+
+
+# ---- Evaluator ----
+@numba.njit(cache=True)
+def eval5(c0, c1, c2, c3, c4):
+    q = (c0 | c1 | c2 | c3 | c4) >> 16
+    if c0 & c1 & c2 & c3 & c4 & 0xF000:
+        return _FLUSHES[q]
+    if _UNIQUE5[q]:
+        return _UNIQUE5[q]
+    product = (c0 & 0xFF) * (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF)
+    return _VALUES[np.searchsorted(_PRODUCTS, product)]
+
+
+@numba.njit(cache=True)
+def eval7(cards):
+    """Best (lowest) rank over the 21 five-card subsets of 7 card codes."""
+    ck = np.empty(7, dtype=np.int64)
+    for i in range(7):
+        ck[i] = _CACTUS[cards[i]]
+
+    best = 7463
+    for n in range(21):
+        c = _COMBOS[n]
+        score = eval5(ck[c[0]], ck[c[1]], ck[c[2]], ck[c[3]], ck[c[4]])
+        if score < best:
+            best = score
+    return best
+
+
+# ---- Monte Carlo rollout ----
+@numba.njit(cache=True, parallel=True)
+def rollout(hole_a, hole_b, board, n_iters):
+    """Deal out the rest of the board n_iters times; return hero (hole_a)
+    equity vs hole_b, counting ties as half a win."""
+    used = np.zeros(64, dtype=np.bool_)
+    for c in hole_a:
+        used[c] = True
+    for c in hole_b:
+        used[c] = True
+    for c in board:
+        used[c] = True
+
+    remaining = np.empty(52, dtype=np.uint8)
+    n_remaining = 0
+    for code in range(64):
+        if (code >> 2) < 13 and not used[code]:
+            remaining[n_remaining] = code
+            n_remaining += 1
+
+    n_board = board.shape[0]
+    missing = 5 - n_board
+    wins = 0.0
+
+    for _ in numba.prange(n_iters):
+        a = np.empty(7, dtype=np.uint8)
+        b = np.empty(7, dtype=np.uint8)
+        a[0], a[1] = hole_a[0], hole_a[1]
+        b[0], b[1] = hole_b[0], hole_b[1]
+        for i in range(n_board):
+            a[2 + i] = board[i]
+            b[2 + i] = board[i]
+
+        # Draw `missing` distinct cards from the remaining deck
+        picked = np.empty(5, dtype=np.int64)
+        for i in range(missing):
+            while True:
+                idx = np.random.randint(0, n_remaining)
+                fresh = True
+                for j in range(i):
+                    if picked[j] == idx:
+                        fresh = False
+                        break
+                if fresh:
+                    break
+            picked[i] = idx
+            a[2 + n_board + i] = remaining[idx]
+            b[2 + n_board + i] = remaining[idx]
+
+        score_a = eval7(a)
+        score_b = eval7(b)
+        if score_a < score_b:
+            wins += 1.0
+        elif score_a == score_b:
+            wins += 0.5
+
+    return wins / n_iters
+
+
+def equity(hole_a: list[str], hole_b: list[str], board: list[str], n_iters=10_000) -> float:
+    """Heads-up equity of hole_a vs hole_b given the current board."""
+    return rollout(encode_cards(hole_a), encode_cards(hole_b), encode_cards(board), n_iters)
@@ -8,6 +8,37 @@ from treys import Evaluator, Card
 
 evaluator = Evaluator()
 
+# Optional CactusKev C evaluator, same ranks as Treys.
+# Build with: python setup.py build_ext --inplace
+try:
+    from _eval7 import eval7
+except ImportError:
+    eval7 = None
+
+
+def hand_rank(board: List[int], hand: List[int]) -> int:
+    # Treys card ints in, Treys rank out (lower is better)
+    if eval7 is not None and len(board) + len(hand) == 7:
+        return eval7(board + hand)
+    return evaluator.evaluate(board, hand)
+
+
+# ---- Card tables, built once ----
+_STANDARD_DECK = tuple(r + s for r in "23456789TJQKA" for s in "cdhs")
+_CARD_INT = {c: Card.new(c) for c in _STANDARD_DECK}
+
+# ---- Legal-action bitmask ----
+# Bit i of a mask is set when ACTIONS[i] is legal.
+ACTIONS = ("fold", "call", "check", "bet", "raise", "allin")
+_ACTION_FLAG = {a: 1 << i for i, a in enumerate(ACTIONS)}
+FOLD_BIT, CALL_BIT, CHECK_BIT, BET_BIT, RAISE_BIT, ALLIN_BIT = range(len(ACTIONS))
+
+# mask -> action names, decoded once for all 64 masks
+_MASK_TO_LIST = [
+    tuple(a for i, a in enumerate(ACTIONS) if mask >> i & 1)
+    for mask in range(1 << len(ACTIONS))
+]
+
 class Phase(enum.Enum):
     PRE_FLOP = "preflop"
     FLOP = "flop"
@@ -16,7 +47,10 @@ class Phase(enum.Enum):
     SHOWDOWN = "showdown"
     COMPLETED = "completed"
 
-@dataclass
+# Board cards dealt (after one burn) on entering each street
+_STREET_DEAL = {Phase.FLOP: 3, Phase.TURN: 1, Phase.RIVER: 1}
+
+@dataclass(slots=True)
 class PlayerState:
     player_id: str
     stack: int
@@ -26,12 +60,29 @@ class PlayerState:
     is_all_in: bool = False
     seat: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Action:
     player_id: str
     action: str
     amount: int = 0
 
+
+def _mask_for(p: PlayerState, highest: int) -> int:
+    # Branch-free: with money to call, CHECK/BET are off and FOLD/CALL/RAISE
+    # depend on the stack; ALLIN only needs chips either way.
+    to_call = highest - p.committed
+    facing = int(to_call > 0)
+    open_ = facing ^ 1
+    has_chips = int(p.stack > 0)
+    return (
+        facing << FOLD_BIT
+        | (facing & (p.stack >= to_call)) << CALL_BIT
+        | open_ << CHECK_BIT
+        | (open_ & has_chips) << BET_BIT
+        | (facing & (p.stack > to_call)) << RAISE_BIT
+        | has_chips << ALLIN_BIT
+    )
+
 class PokerEngine:
     def __init__(self, player_ids: List[str], starting_stacks=None, small_blind=5, big_blind=10):
         assert len(player_ids) >= 2
@@ -43,11 +94,13 @@ class PokerEngine:
             PlayerState(player_id=pid, stack=starting_stacks[i], seat=i)
             for i, pid in enumerate(player_ids)
         ]
+        self._pid_to_idx = {pid: i for i, pid in enumerate(player_ids)}
 
         self.phase = None
         self.button_index = 0
         self.current_actor_index = 0
         self.deck = []
+        self._deck_idx = 0  # next card to deal; the deck itself is never shifted
         self.community_cards = []
         self.hand_id = str(uuid.uuid4())
         self.pot_history = []
@@ -57,6 +110,11 @@ class PokerEngine:
         self.total_pot = 0
         self.deck_seed = None
 
+        # Running aggregates, updated wherever committed/flags change
+        self._highest_committed = 0
+        self._num_folded = 0
+        self._num_all_in = 0
+
         self._phase_order = [
             Phase.PRE_FLOP,
             Phase.FLOP,
@@ -65,25 +123,30 @@ class PokerEngine:
             Phase.SHOWDOWN,
             Phase.COMPLETED
         ]
+        self._next_phase = dict(zip(self._phase_order, self._phase_order[1:]))
 
     # ---- Deck ----
     @staticmethod
     def standard_deck():
-        ranks = "23456789TJQKA"
-        suits = "cdhs"
-        return [r + s for r in ranks for s in suits]
+        return list(_STANDARD_DECK)
 
     @staticmethod
     def shuffle_with_seed(seed: str):
-        deck = PokerEngine.standard_deck()
+        deck = list(_STANDARD_DECK)
         rnd = random.Random(seed)
         rnd.shuffle(deck)
         return deck
 
+    def _draw(self):
+        card = self.deck[self._deck_idx]
+        self._deck_idx += 1
+        return card
+
     # ---- Start Hand ----
     def start_hand(self, deck_seed=None):
         self.deck_seed = deck_seed or str(uuid.uuid4())
         self.deck = self.shuffle_with_seed(self.deck_seed)
+        self._deck_idx = 0
         self.community_cards = []
         self.total_pot = 0
         self.actions = []
@@ -95,6 +158,10 @@ class PokerEngine:
             p.is_folded = False
             p.is_all_in = False
 
+        self._highest_committed = 0
+        self._num_folded = 0
+        self._num_all_in = 0
+
         sb = self.button_index
         bb = (self.button_index + 1) % len(self.players)
 
@@ -104,9 +171,11 @@ class PokerEngine:
             p.stack -= actual
             p.committed += actual
             self.total_pot += actual
+            self._highest_committed = max(self._highest_committed, p.committed)
             self.actions.append(Action(p.player_id, f"post_{label}", actual))
             if p.stack == 0:
                 p.is_all_in = True
+                self._num_all_in += 1
 
         post_blind(sb, self.small_blind, "sb")
         post_blind(bb, self.big_blind, "bb")
@@ -115,7 +184,7 @@ class PokerEngine:
         for _ in range(2):
             for i in range(len(self.players)):
                 seat = (deal_start + i) % len(self.players)
-                card = self.deck.pop(0)
+                card = self._draw()
                 self.players[seat].hole_cards.append(card)
 
         self.phase = Phase.PRE_FLOP
@@ -136,11 +205,13 @@ class PokerEngine:
         }
 
     # ---- Helpers ----
+    def _num_can_act(self) -> int:
+        # Players neither folded nor all-in (the two flags never overlap)
+        return len(self.players) - self._num_folded - self._num_all_in
+
     def find_player_index(self, player_id):
-        for i, p in enumerate(self.players):
-            if p.player_id == player_id:
-                return i
-        raise KeyError(player_id)
+        # Raises KeyError(player_id) for unknown ids
+        return self._pid_to_idx[player_id]
 
     def canonical_state_for(self, player_id):
         return {
@@ -167,33 +238,17 @@ class PokerEngine:
         }
 
     # ---- Legal Actions ----
-    def legal_actions(self, player_id: str) -> List[str]:
+    def legal_actions_mask(self, player_id: str) -> int:
         idx = self.find_player_index(player_id)
         p = self.players[idx]
 
         if p.is_folded or p.is_all_in or self.phase == Phase.COMPLETED:
-            return []
-
-        highest = max(pl.committed for pl in self.players)
-        to_call = highest - p.committed
-
-        # If there is money to call, NO CHECK is allowed.
-        if to_call > 0:
-            actions = ["fold"]
-            if p.stack >= to_call:
-                actions.append("call")
-            if p.stack > to_call:
-                actions.append("raise")
-            if p.stack > 0:
-                actions.append("allin")
-            return actions
-
-        # No one has bet more → check is allowed
-        actions = ["check"]
-        if p.stack > 0:
-            actions.append("bet")
-            actions.append("allin")
-        return actions
+            return 0
+
+        return _mask_for(p, self._highest_committed)
+
+    def legal_actions(self, player_id: str) -> List[str]:
+        return list(_MASK_TO_LIST[self.legal_actions_mask(player_id)])
 
 
     # ---- Apply Action ----
@@ -207,15 +262,15 @@ class PokerEngine:
         if p.is_folded or p.is_all_in:
             return {"error": "Player cannot act"}
 
-        legal = self.legal_actions(player_id)
-        if action not in legal:
-            return {"error": f"Illegal action: {action}. Allowed: {legal}"}
+        legal = self.legal_actions_mask(player_id)
+        if not legal & _ACTION_FLAG.get(action, 0):
+            return {"error": f"Illegal action: {action}. Allowed: {list(_MASK_TO_LIST[legal])}"}
 
-        highest = max(pl.committed for pl in self.players)
-        to_call = highest - p.committed
+        to_call = self._highest_committed - p.committed
 
         if action == "fold":
             p.is_folded = True
+            self._num_folded += 1
             self.actions.append(Action(player_id, action, 0))
 
         elif action == "call":
@@ -223,8 +278,10 @@ class PokerEngine:
             p.stack -= pay
             p.committed += pay
             self.total_pot += pay
+            self._highest_committed = max(self._highest_committed, p.committed)
             if p.stack == 0:
                 p.is_all_in = True
+                self._num_all_in += 1
             self.actions.append(Action(player_id, action, pay))
 
         elif action == "check":
@@ -236,8 +293,10 @@ class PokerEngine:
             p.stack -= amount
             p.committed += amount
             self.total_pot += amount
+            self._highest_committed = max(self._highest_committed, p.committed)
             if p.stack == 0:
                 p.is_all_in = True
+                self._num_all_in += 1
             self.actions.append(Action(player_id, "bet", amount))
 
         elif action == "raise":
@@ -247,8 +306,10 @@ class PokerEngine:
             p.stack -= pay
             p.committed += pay
             self.total_pot += pay
+            self._highest_committed = max(self._highest_committed, p.committed)
             if p.stack == 0:
                 p.is_all_in = True
+                self._num_all_in += 1
             self.actions.append(Action(player_id, "raise", pay))
 
         elif action == "allin":
@@ -256,7 +317,9 @@ class PokerEngine:
             p.stack = 0
             p.committed += pay
             self.total_pot += pay
+            self._highest_committed = max(self._highest_committed, p.committed)
             p.is_all_in = True
+            self._num_all_in += 1
             self.actions.append(Action(player_id, "allin", pay))
 
         # turn moves
@@ -274,14 +337,8 @@ class PokerEngine:
 
     # ---- Turn rotation ----
     def _advance_turn(self):
-        # Determine if any player can act
-        active_players = [
-            p for p in self.players
-            if not p.is_folded and not p.is_all_in
-        ]
-
         # If no one can act: force betting round complete
-        if len(active_players) == 0:
+        if self._num_can_act() == 0:
             return
 
         n = len(self.players)
@@ -296,18 +353,15 @@ class PokerEngine:
 
     # ---- Betting round complete ----
     def _is_betting_round_complete(self) -> bool:
-        # Count players who can act
-        active = [p for p in self.players if not p.is_folded and not p.is_all_in]
-
         # Everyone folded or all-in → round is complete
-        if len(active) == 0:
+        if self._num_can_act() == 0:
             return True
 
-        highest = max(p.committed for p in self.players)
+        highest = self._highest_committed
 
         # If any active player has not matched the highest, round not done
-        for p in active:
-            if p.committed != highest:
+        for p in self.players:
+            if not p.is_folded and not p.is_all_in and p.committed != highest:
                 return False
 
         # All active players matched → round done
@@ -315,54 +369,28 @@ class PokerEngine:
 
 
     # ---- Deal streets ----
-    def _advance_phase(self):
-        cur = self._phase_order.index(self.phase)
-        next_phase = self._phase_order[cur + 1]
-        self.phase = next_phase
-
-        # --- Normal street dealing ---
-        if self.phase == Phase.FLOP:
-            _ = self.deck.pop(0)
-            self.community_cards += [self.deck.pop(0) for _ in range(3)]
-
-        elif self.phase == Phase.TURN:
-            _ = self.deck.pop(0)
-            self.community_cards.append(self.deck.pop(0))
-
-        elif self.phase == Phase.RIVER:
-            _ = self.deck.pop(0)
-            self.community_cards.append(self.deck.pop(0))
-
+    def _deal_street(self, n_cards):
+        self._deck_idx += 1  # burn
+        end = self._deck_idx + n_cards
+        self.community_cards.extend(self.deck[self._deck_idx:end])
+        self._deck_idx = end
+
+    def _step_phase(self):
+        # Move to the next phase and deal / settle what it calls for
+        self.phase = self._next_phase[self.phase]
+        if self.phase in _STREET_DEAL:
+            self._deal_street(_STREET_DEAL[self.phase])
         elif self.phase == Phase.SHOWDOWN:
             self.evaluate_and_distribute()
             self.phase = Phase.COMPLETED
-            return
-
-        # --- Auto-run remaining streets if everyone is all-in/folded ---
-        active = [
-            p for p in self.players
-            if not p.is_folded and not p.is_all_in
-        ]
 
-        # If no one left to act, fast-forward the rest of the hand
-        if len(active) == 0:
-            while self.phase not in (Phase.SHOWDOWN, Phase.COMPLETED):
-                cur = self._phase_order.index(self.phase)
-                next_phase = self._phase_order[cur + 1]
-                self.phase = next_phase
-
-                if self.phase == Phase.TURN:
-                    _ = self.deck.pop(0)
-                    self.community_cards.append(self.deck.pop(0))
-
-                elif self.phase == Phase.RIVER:
-                    _ = self.deck.pop(0)
-                    self.community_cards.append(self.deck.pop(0))
+    def _advance_phase(self):
+        self._step_phase()
 
-                elif self.phase == Phase.SHOWDOWN:
-                    self.evaluate_and_distribute()
-                    self.phase = Phase.COMPLETED
-                    break
+        # --- Auto-run remaining streets if everyone is all-in/folded ---
+        if self._num_can_act() == 0:
+            while self.phase != Phase.COMPLETED:
+                self._step_phase()
 
 
     # ---- EVALUATION (REAL WINNER SELECTION) ----
@@ -380,12 +408,12 @@ class PokerEngine:
             self.total_pot = 0
             return
 
-        board = [Card.new(c) for c in self.community_cards]
+        board = [_CARD_INT[c] for c in self.community_cards]
 
         scores = []
         for p in active:
-            hand = [Card.new(c) for c in p.hole_cards]
-            score = evaluator.evaluate(board, hand)
+            hand = [_CARD_INT[c] for c in p.hole_cards]
+            score = hand_rank(board, hand)
             scores.append((score, p))
 
         scores.sort(key=lambda x: x[0])
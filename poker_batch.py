@@ -0,0 +1,255 @@
+import numpy as np
+
+from poker_agent import ACTIONS, PokerEngine, Phase, _CARD_INT, hand_rank
+from poker_agent import FOLD_BIT, CALL_BIT, CHECK_BIT, BET_BIT, RAISE_BIT, ALLIN_BIT
+
+# ---- Encodings ----
+# Cards are indices into DECK; phases are indices into PHASES.
+DECK = PokerEngine.standard_deck()
+TREYS_INT = [_CARD_INT[c] for c in DECK]
+
+PHASES = [
+    Phase.PRE_FLOP,
+    Phase.FLOP,
+    Phase.TURN,
+    Phase.RIVER,
+    Phase.SHOWDOWN,
+    Phase.COMPLETED
+]
+PRE_FLOP, FLOP, TURN, RIVER, SHOWDOWN, COMPLETED = range(len(PHASES))
+
+# Column order of legal_mask() and the codes apply_actions() expects:
+# the PokerEngine legal-action bits
+FOLD, CALL, CHECK, BET, RAISE, ALLIN = FOLD_BIT, CALL_BIT, CHECK_BIT, BET_BIT, RAISE_BIT, ALLIN_BIT
+
+_STREET_CARDS = {FLOP: 3, TURN: 1, RIVER: 1}
+
+
+class PokerEngineBatch:
+    """K independent hands of the PokerEngine rules, stored as (K, N) arrays.
+
+    Same betting rules as PokerEngine, but every step acts on all hands at
+    once so bulk simulation (equity estimates, training data) avoids the
+    per-player Python attribute traffic of List[PlayerState].
+    """
+
+    def __init__(self, num_hands: int, num_players: int, starting_stack=1000,
+                 small_blind=5, big_blind=10, button_index=0):
+        assert num_players >= 2
+
+        self.num_hands = num_hands
+        self.num_players = num_players
+        self.starting_stack = starting_stack
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.button_index = button_index
+
+        shape = (num_hands, num_players)
+        self.stacks = np.zeros(shape, dtype=np.int32)
+        self.committed = np.zeros(shape, dtype=np.int32)
+        self.is_folded = np.zeros(shape, dtype=bool)
+        self.is_all_in = np.zeros(shape, dtype=bool)
+        self.hole_cards = np.zeros(shape + (2,), dtype=np.int8)
+
+        self.community_cards = np.zeros((num_hands, 5), dtype=np.int8)
+        self.num_community = np.zeros(num_hands, dtype=np.int8)
+        self.total_pot = np.zeros(num_hands, dtype=np.int32)
+        self.phase = np.full(num_hands, COMPLETED, dtype=np.int8)
+        self.current_actor = np.zeros(num_hands, dtype=np.intp)
+        self.deck = np.zeros((num_hands, 52), dtype=np.int8)
+        self.deck_idx = np.zeros(num_hands, dtype=np.intp)
+
+    # ---- Start Hands ----
+    def start_hands(self, seed=None, decks=None):
+        """Shuffle (or take the given (K, 52) card-index decks), post blinds
+        and deal hole cards for every hand."""
+        k, n = self.num_hands, self.num_players
+        rows = np.arange(k)
+
+        if decks is None:
+            rng = np.random.default_rng(seed)
+            ordered = np.tile(np.arange(52, dtype=np.int8), (k, 1))
+            decks = rng.permuted(ordered, axis=1)
+        self.deck[:] = decks
+
+        self.stacks[:] = self.starting_stack
+        self.committed[:] = 0
+        self.is_folded[:] = False
+        self.is_all_in[:] = False
+        self.num_community[:] = 0
+        self.total_pot[:] = 0
+
+        sb = self.button_index
+        bb = (self.button_index + 1) % n
+        for seat, amount in ((sb, self.small_blind), (bb, self.big_blind)):
+            actual = np.minimum(self.stacks[:, seat], amount)
+            self.stacks[:, seat] -= actual
+            self.committed[:, seat] += actual
+            self.total_pot += actual
+            self.is_all_in[:, seat] |= self.stacks[:, seat] == 0
+
+        # Same order as PokerEngine: one card around the table, twice
+        deal_start = (self.button_index + 1) % n
+        for r in range(2):
+            for i in range(n):
+                seat = (deal_start + i) % n
+                self.hole_cards[:, seat, r] = self.deck[:, r * n + i]
+        self.deck_idx[:] = 2 * n
+
+        self.phase[:] = PRE_FLOP
+        self.current_actor[:] = (bb + 1) % n
+        self._seek_actor(rows, start_offset=0)
+
+    # ---- Vectorized queries ----
+    def can_act(self):
+        return ~self.is_folded & ~self.is_all_in
+
+    def highest_committed(self):
+        return self.committed.max(axis=1)
+
+    def to_call(self):
+        return self.highest_committed()[:, None] - self.committed
+
+    def round_done(self):
+        highest = self.highest_committed()
+        return ((self.committed == highest[:, None]) | self.is_folded | self.is_all_in).all(axis=1)
+
+    def legal_mask(self):
+        """(K, len(ACTIONS)) bool mask of legal actions for each hand's
+        current actor; all False once a hand is complete."""
+        rows = np.arange(self.num_hands)
+        seat = self.current_actor
+        stack = self.stacks[rows, seat]
+        to_call = self.highest_committed() - self.committed[rows, seat]
+        live = (self.phase < SHOWDOWN) & self.can_act()[rows, seat]
+
+        facing = to_call > 0
+        mask = np.zeros((self.num_hands, len(ACTIONS)), dtype=bool)
+        mask[:, FOLD] = facing
+        mask[:, CALL] = facing & (stack >= to_call)
+        mask[:, RAISE] = facing & (stack > to_call)
+        mask[:, CHECK] = ~facing
+        mask[:, BET] = ~facing & (stack > 0)
+        mask[:, ALLIN] = stack > 0
+        mask &= live[:, None]
+        return mask
+
+    # ---- Apply Actions ----
+    def apply_actions(self, actions, amounts=None):
+        """Apply one action (codes from ACTIONS) per hand for its current
+        actor. Returns a bool mask of hands where the action was accepted;
+        rejected or already-complete hands are left untouched."""
+        k = self.num_hands
+        rows = np.arange(k)
+        actions = np.asarray(actions, dtype=np.intp)
+        amounts = np.zeros(k, dtype=np.int32) if amounts is None else np.asarray(amounts, dtype=np.int32)
+
+        seat = self.current_actor
+        stack = self.stacks[rows, seat]
+        to_call = self.highest_committed() - self.committed[rows, seat]
+
+        ok = self.legal_mask()[rows, actions]
+        sized = (actions == BET) | (actions == RAISE)
+        ok &= ~sized | ((amounts > 0) & (amounts <= stack))
+
+        pay = np.zeros(k, dtype=np.int32)
+        pay = np.where(actions == CALL, np.minimum(stack, to_call), pay)
+        pay = np.where(actions == BET, amounts, pay)
+        pay = np.where(actions == RAISE, np.minimum(stack, to_call + amounts), pay)
+        pay = np.where(actions == ALLIN, stack, pay)
+
+        r, s, pay = rows[ok], seat[ok], pay[ok]
+        self.stacks[r, s] -= pay
+        self.committed[r, s] += pay
+        self.total_pot[r] += pay
+        self.is_folded[r, s] |= actions[ok] == FOLD
+        self.is_all_in[r, s] |= (self.stacks[r, s] == 0) & (actions[ok] != FOLD)
+
+        self._advance_turn(r)
+        self._advance_phase(r[self.round_done()[r]])
+        return ok
+
+    # ---- Turn rotation ----
+    def _seek_actor(self, rows, start_offset):
+        # Move each hand's actor to the first seat (from start_offset on)
+        # that can act; hands where nobody can act keep their actor.
+        n = self.num_players
+        offsets = (self.current_actor[rows, None] + np.arange(start_offset, start_offset + n)) % n
+        candidates = self.can_act()[rows[:, None], offsets]
+        first = candidates.argmax(axis=1)
+        found = candidates.any(axis=1)
+        self.current_actor[rows[found]] = offsets[found, first[found]]
+
+    def _advance_turn(self, rows):
+        self._seek_actor(rows, start_offset=1)
+
+    # ---- Deal streets ----
+    def _deal(self, rows, n_cards):
+        burn = self.deck_idx[rows] + 1
+        picks = burn[:, None] + np.arange(n_cards)
+        slots = self.num_community[rows, None] + np.arange(n_cards)
+        self.community_cards[rows[:, None], slots] = self.deck[rows[:, None], picks]
+        self.num_community[rows] += n_cards
+        self.deck_idx[rows] = burn + n_cards
+
+    def _step_phase(self, rows):
+        self.phase[rows] += 1
+        for phase, n_cards in _STREET_CARDS.items():
+            self._deal(rows[self.phase[rows] == phase], n_cards)
+
+        at_showdown = rows[self.phase[rows] == SHOWDOWN]
+        for k in at_showdown:
+            self._evaluate_and_distribute(k)
+        self.phase[at_showdown] = COMPLETED
+
+    def _advance_phase(self, rows):
+        self._step_phase(rows)
+
+        # Auto-run remaining streets where everyone is all-in/folded
+        stuck = rows[~self.can_act()[rows].any(axis=1) & (self.phase[rows] != COMPLETED)]
+        while stuck.size:
+            self._step_phase(stuck)
+            stuck = stuck[self.phase[stuck] != COMPLETED]
+
+    # ---- Evaluation ----
+    def _evaluate_and_distribute(self, k):
+        alive = np.flatnonzero(~self.is_folded[k])
+        pot = int(self.total_pot[k])
+        self.total_pot[k] = 0
+
+        if alive.size == 1:
+            self.stacks[k, alive[0]] += pot
+            return
+
+        board = [TREYS_INT[c] for c in self.community_cards[k, :self.num_community[k]]]
+        scores = [
+            hand_rank(board, [TREYS_INT[c] for c in self.hole_cards[k, seat]])
+            for seat in alive
+        ]
+        best = min(scores)
+        tied = [seat for seat, score in zip(alive, scores) if score == best]
+
+        share, remainder = divmod(pot, len(tied))
+        self.stacks[k, tied] += share
+        # give remainder to first in seat order
+        self.stacks[k, tied[0]] += remainder
+
+    # ---- Serialize ----
+    def serialize(self, k: int):
+        """PokerEngine.serialize()-shaped view of hand k."""
+        return {
+            "phase": PHASES[self.phase[k]].value,
+            "players": [
+                {
+                    "seat": seat,
+                    "stack": int(self.stacks[k, seat]),
+                    "committed": int(self.committed[k, seat]),
+                    "is_folded": bool(self.is_folded[k, seat]),
+                    "is_all_in": bool(self.is_all_in[k, seat]),
+                    "hole_cards": [DECK[c] for c in self.hole_cards[k, seat]]
+                }
+                for seat in range(self.num_players)
+            ],
+            "community_cards": [DECK[c] for c in self.community_cards[k, :self.num_community[k]]],
+            "total_pot": int(self.total_pot[k]),
+        }
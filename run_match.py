@@ -1,64 +1,317 @@
+import asyncio
+import collections
+import copy
+import io
+import json
+import sys
+
+import openai
+
 from poker_agent import PokerEngine, Phase
-from agent_llm import AgentLLM
+from agent_llm import AgentLLM, client
 
+# 4 players:
+PLAYER_MODELS = {
+    "gpt4o_A": "gpt-4o",
+    "gpt4omini": "gpt-4o-mini",
+    "gpt4o_B": "gpt-4o",        # second instance of GPT-4o
+    "o3mini": "o3-mini"         # OpenAI o3-mini
+}
 
-def run_multi_player_match():
-    # 4 players:
-    player_ids = ["gpt4o_A", "gpt4omini", "gpt4o_B", "o3mini"]
+# OpenAI Batch API limits / polling
+BATCH_MAX_REQUESTS = 50_000
+BATCH_POLL_SECONDS = 30
+
+
+def _decision_key(player_id: str, state: dict, legal: list[str]):
+    # Everything the agent sees; equal keys mean an identical LLM request
+    return player_id, json.dumps([state, legal], sort_keys=True)
+
+
+def _predict_next_decision(engine: PokerEngine, player_id: str, legal: list[str]):
+    """Guess the next actor's (player_id, state, legal) assuming the current
+    actor takes the passive line (call/check). Returns None when there is
+    nothing worth speculating on."""
+    if "call" in legal:
+        predicted = "call"
+    elif "check" in legal:
+        predicted = "check"
+    else:
+        return None
+
+    sim = copy.deepcopy(engine)
+    if "error" in sim.apply_action(player_id, predicted, 0):
+        return None
+    if sim.phase == Phase.COMPLETED:
+        return None
+
+    next_player = sim.players[sim.current_actor_index]
+    if next_player.player_id == player_id or next_player.is_folded or next_player.is_all_in:
+        return None
+
+    next_pid = next_player.player_id
+    return next_pid, sim.canonical_state_for(next_pid), sim.legal_actions(next_pid)
+
+
+def _discard(task: asyncio.Task):
+    # Mispredicted call: cancel it, and swallow any error it already raised
+    if task.done():
+        if not task.cancelled():
+            task.exception()
+    else:
+        task.cancel()
 
-    models = {
-        "gpt4o_A": "gpt-4o",
-        "gpt4omini": "gpt-4o-mini",
-        "gpt4o_B": "gpt-4o",        # second instance of GPT-4o
-        "o3mini": "o3-mini"         # OpenAI o3-mini
-    }
+
+def new_response_caches():
+    """One empty response cache per (player_id, model), for new_match()."""
+    return {(pid, model): collections.OrderedDict() for pid, model in PLAYER_MODELS.items()}
+
+
+def new_match(seed: str, semantic_caches=None, response_caches=None):
+    """Fresh engine (hand dealt from `seed`) plus one agent per seat.
+    `semantic_caches` maps model name -> SemanticCache and
+    `response_caches` maps (player_id, model) -> LRU dict, both shared
+    across the matches they are passed to."""
+    semantic_caches = semantic_caches or {}
+    response_caches = response_caches or {}
+    player_ids = list(PLAYER_MODELS)
 
     engine = PokerEngine(player_ids, starting_stacks=[500, 500, 500, 500])
-    engine.start_hand(deck_seed="demo-seed-4player")
-    print("=== INITIAL STATE ===")
-    print(engine.serialize())
+    engine.start_hand(deck_seed=seed)
+    print(f"[{seed}] === INITIAL STATE ===")
+    print(f"[{seed}]", engine.serialize())
 
     agents = {
-        pid: AgentLLM(models[pid], pid)
+        pid: AgentLLM(
+            PLAYER_MODELS[pid],
+            pid,
+            semantic_cache=semantic_caches.get(PLAYER_MODELS[pid]),
+            big_blind=engine.big_blind,
+            response_cache=response_caches.get((pid, PLAYER_MODELS[pid])),
+        )
         for pid in player_ids
     }
+    return engine, agents
 
-    print("=== Starting 4-player match ===")
 
-    # Main game loop
+def next_decision(engine: PokerEngine):
+    """(player_id, state, legal) for whoever must act next, skipping
+    seats that are folded/all-in; None once the hand is over."""
     while engine.phase != Phase.COMPLETED:
-
-        # Whose turn is it?
-        current_pid = engine.players[engine.current_actor_index].player_id
-        agent = agents[current_pid]
-
-        # Build state
-        player_obj = next(p for p in engine.players if p.player_id == current_pid)
+        player_obj = engine.players[engine.current_actor_index]
         if player_obj.is_all_in or player_obj.is_folded:
             engine._advance_turn()
             continue
-        
-        state = engine.canonical_state_for(current_pid)
-        legal = engine.legal_actions(current_pid)
+        current_pid = player_obj.player_id
+        return current_pid, engine.canonical_state_for(current_pid), engine.legal_actions(current_pid)
+    return None
+
+
+async def run_one_match(seed: str, semantic_caches=None, response_caches=None):
+    engine, agents = new_match(seed, semantic_caches, response_caches)
+
+    print(f"[{seed}] === Starting 4-player match ===")
+
+    # decision key -> in-flight speculative decide() for the next actor
+    speculative = {}
+    # Why the match was cut short, if it was; reported in the result
+    failure = None
+
+    try:
+        # Main game loop
+        while (decision := next_decision(engine)) is not None:
+
+            # Whose turn is it?
+            current_pid, state, legal = decision
+            agent = agents[current_pid]
+
+            # Reuse the speculative call if we predicted this exact spot
+            pending = speculative.pop(_decision_key(current_pid, state, legal), None)
+            for task in speculative.values():
+                _discard(task)
+            speculative.clear()
+
+            if pending is None:
+                pending = asyncio.create_task(agent.decide(state, legal))
+
+            # Meanwhile, start the next actor's call assuming a passive action
+            prediction = _predict_next_decision(engine, current_pid, legal)
+            if prediction is not None:
+                next_pid, next_state, next_legal = prediction
+                speculative[_decision_key(next_pid, next_state, next_legal)] = asyncio.create_task(
+                    agents[next_pid].decide(next_state, next_legal)
+                )
+
+            # Ask the LLM for an action (other matches keep running meanwhile)
+            try:
+                action, amount = await pending
+            except ValueError as exc:
+                # Refusal or reply outside the schema: end this match only
+                failure = f"Bad reply from {current_pid}: {exc}"
+                print(f"[{seed}] {failure}")
+                break
+            except openai.APIError as exc:
+                # API/transport error that outlived the SDK retries
+                # (timeouts included): same, the other matches keep going
+                failure = f"API error for {current_pid}: {exc}"
+                print(f"[{seed}] {failure}")
+                break
+            print(f"[{seed}] {current_pid} → {action} {amount}")
+
+            result = engine.apply_action(current_pid, action, amount)
+            print(f"[{seed}]", result)
+
+            if "error" in result:
+                print(f"[{seed}] Engine error:", result)
+                break
+    finally:
+        for task in speculative.values():
+            _discard(task)
+
+    result = engine.serialize()
+    if failure is not None:
+        result["error"] = failure
+    print(f"\n[{seed}] === FINAL RESULT ===")
+    print(f"[{seed}]", result)
+    return result
+
+
+async def _run_batch(bodies: dict):
+    """Send {custom_id: request body} through the Batch API and wait for
+    it; returns {custom_id: reply content}, without ids whose request failed."""
+    lines = [
+        json.dumps({"custom_id": cid, "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for cid, body in bodies.items()
+    ]
+    upload = await client.files.create(
+        file=("decisions.jsonl", io.BytesIO("\n".join(lines).encode())),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await client.batches.retrieve(batch.id)
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended as {batch.status}")
+
+    replies = {}
+    if batch.output_file_id:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            row = json.loads(line)
+            if row.get("error") or row["response"]["status_code"] != 200:
+                continue
+            replies[row["custom_id"]] = row["response"]["body"]["choices"][0]["message"]["content"]
+    return replies
+
+
+async def run_matches_via_batch_api(seeds: list[str]):
+    """Lock-step every match one decision at a time through the (half-price,
+    high-latency) Batch API: each round sends the pending decision of
+    every unfinished match, in files of up to BATCH_MAX_REQUESTS lines."""
+    # Keyed (and custom_id'd) by position too, so repeated seeds stay separate matches
+    shared = new_response_caches()
+    matches = {f"{i}:{seed}": new_match(seed, response_caches=shared) for i, seed in enumerate(seeds)}
+    live = set(matches)
+
+    while live:
+        pending = {}
+        for match_id in list(live):
+            engine, agents = matches[match_id]
+            decision = next_decision(engine)
+            if decision is None:
+                live.discard(match_id)
+                continue
+            pending[match_id] = decision
+
+        hits = {}
+        for match_id, (pid, state, legal) in pending.items():
+            cached = matches[match_id][1][pid].cached_decision(state, legal)
+            if cached is not None:
+                hits[match_id] = cached
+        uncached = [match_id for match_id in pending if match_id not in hits]
+
+        replies = {}
+        for start in range(0, len(uncached), BATCH_MAX_REQUESTS):
+            chunk = uncached[start:start + BATCH_MAX_REQUESTS]
+            bodies = {}
+            for match_id in chunk:
+                pid, state, legal = pending[match_id]
+                bodies[match_id] = matches[match_id][1][pid].request_body(state, legal)
+            replies.update(await _run_batch(bodies))
+
+        for match_id, (current_pid, state, legal) in pending.items():
+            engine, agents = matches[match_id]
+            agent = agents[current_pid]
+            if match_id in hits:
+                action, amount = hits[match_id]
+            elif match_id in replies:
+                try:
+                    action, amount = agent.record_response(state, legal, replies[match_id])
+                except ValueError as exc:
+                    print(f"[{match_id}] Bad reply from {current_pid}: {exc}")
+                    live.discard(match_id)
+                    continue
+            else:
+                print(f"[{match_id}] Batch request failed for {current_pid}")
+                live.discard(match_id)
+                continue
+            print(f"[{match_id}] {current_pid} → {action} {amount}")
+
+            result = engine.apply_action(current_pid, action, amount)
+            print(f"[{match_id}]", result)
+            if "error" in result:
+                print(f"[{match_id}] Engine error:", result)
+                live.discard(match_id)
+
+    results = []
+    for match_id, (engine, _) in matches.items():
+        print(f"\n[{match_id}] === FINAL RESULT ===")
+        print(f"[{match_id}]", engine.serialize())
+        results.append(engine.serialize())
+    return results
+
+
+async def run_matches(seeds: list[str], use_batch_api: bool = False, use_semantic_cache: bool = False):
+    """Play one match per seed concurrently over the shared async client.
+
+    Live mode runs one coroutine per match, each only blocking on its own
+    LLM calls (bounded by the agent_llm rate-limit semaphore). With
+    use_batch_api the decisions go through the Batch API instead: half the
+    cost, but each round can take up to the 24h completion window.
 
-        # Ask the LLM for an action
-        action, amount = agent.decide(state, legal)
-        print(f"{current_pid} → {action} {amount}")
+    use_semantic_cache (live mode only) shares one embedding-keyed
+    decision cache per model across all matches; needs faiss.
 
-        result = engine.apply_action(current_pid, action, amount)
-        print(result)
+    In live mode a match whose LLM call fails (bad reply, API error)
+    ends early with an "error" entry in its result; the others finish."""
+    if use_batch_api:
+        return await run_matches_via_batch_api(seeds)
 
-        # If hand ended after this action
-        if engine.phase == Phase.COMPLETED:
-            break
+    semantic_caches = None
+    if use_semantic_cache:
+        from semantic_cache import SemanticCache
+        semantic_caches = {model: SemanticCache(client) for model in set(PLAYER_MODELS.values())}
+    # Recurring spots (preflop especially) hit across matches, not just within one
+    shared = new_response_caches()
+    return await asyncio.gather(*[run_one_match(s, semantic_caches, shared) for s in seeds])
 
-        if "error" in result:
-            print("Engine error:", result)
-            break
 
-    print("\n=== FINAL RESULT ===")
-    print(engine.serialize())
+async def main(args: list[str]):
+    use_batch_api = "--batch-api" in args
+    use_semantic_cache = "--semantic-cache" in args
+    seeds = [a for a in args if not a.startswith("--")] or ["demo-seed-4player"]
+    try:
+        await run_matches(seeds, use_batch_api=use_batch_api, use_semantic_cache=use_semantic_cache)
+    finally:
+        # Close the shared HTTP/2 pool inside the loop that opened it
+        await client.close()
 
 
 if __name__ == "__main__":
-    run_multi_player_match()
+    asyncio.run(main(sys.argv[1:]))
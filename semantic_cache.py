@@ -0,0 +1,91 @@
+import faiss
+import numpy as np
+from pydantic import BaseModel
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+VERIFIER_MODEL = "gpt-4o-mini"
+
+# Cosine similarity gates: at or above HIT_THRESHOLD reuse outright,
+# between the two ask the cheap verifier model, below it a miss.
+HIT_THRESHOLD = 0.97
+VERIFY_THRESHOLD = 0.90
+
+VERIFIER_PROMPT = """
+A poker agent already decided on a spot and we want to reuse that decision.
+
+Cached spot: {cached}
+Cached decision: {action}
+
+Current spot: {current}
+
+Would the cached decision be equally correct in the current spot?
+Answer in JSON: {{"reuse": true}} or {{"reuse": false}}
+"""
+
+
+class Verdict(BaseModel):
+    reuse: bool
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of decisions, partitioned by an exact key.
+
+    Only spots with an equal key (phase, cards, legal actions) are ever
+    compared; within a partition, the embedded text of the table numbers
+    (in big blinds) picks the closest one. Stores (action, amount as a fraction of
+    stack) per spot; stack scaling is left to the caller.
+    """
+
+    def __init__(self, client, embedding_model=EMBEDDING_MODEL, verifier_model=VERIFIER_MODEL):
+        self.client = client
+        self.embedding_model = embedding_model
+        self.verifier_model = verifier_model
+        # exact key -> (faiss.IndexFlatIP, [(descriptor, action, fraction)])
+        self.partitions = {}
+
+    def __contains__(self, key) -> bool:
+        # Any cached spot to compare against under this exact key?
+        return key in self.partitions
+
+    async def embed(self, text: str) -> np.ndarray:
+        response = await self.client.embeddings.create(model=self.embedding_model, input=text)
+        vec = np.array([response.data[0].embedding], dtype=np.float32)
+        # Unit vectors: inner product == cosine similarity
+        faiss.normalize_L2(vec)
+        return vec
+
+    async def lookup(self, key, text: str, vec: np.ndarray):
+        """(action, fraction) of the closest cached spot with the same key,
+        or None. `text` is the full spot, shown to the verifier."""
+        partition = self.partitions.get(key)
+        if partition is None:
+            return None
+        index, entries = partition
+
+        sims, rows = index.search(vec, 1)
+        sim, row = float(sims[0][0]), int(rows[0][0])
+        if sim < VERIFY_THRESHOLD:
+            return None
+
+        cached_text, action, fraction = entries[row]
+        if sim >= HIT_THRESHOLD or await self._verify(cached_text, action, text):
+            return action, fraction
+        return None
+
+    def add(self, key, text: str, vec: np.ndarray, action: str, fraction: float):
+        if key not in self.partitions:
+            self.partitions[key] = (faiss.IndexFlatIP(vec.shape[1]), [])
+        index, entries = self.partitions[key]
+        index.add(vec)
+        entries.append((text, action, fraction))
+
+    async def _verify(self, cached_text: str, action: str, text: str) -> bool:
+        # Gray zone: let a small model judge whether the spots play the same
+        prompt = VERIFIER_PROMPT.format(cached=cached_text, action=action, current=text)
+        response = await self.client.chat.completions.create(
+            model=self.verifier_model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0
+        )
+        return Verdict.model_validate_json(response.choices[0].message.content).reuse
@@ -0,0 +1,9 @@
+from setuptools import Extension, setup
+
+# Optional C hand evaluator used by PokerEngine when available.
+# Build it next to the sources with:
+#     python setup.py build_ext --inplace
+setup(
+    py_modules=[],
+    ext_modules=[Extension("_eval7", ["_eval7.c"], extra_compile_args=["-O3"])],
+)
@@ -0,0 +1,30 @@
+import random
+
+from treys import Card, Evaluator
+
+from equity import encode_cards, equity, eval7
+
+evaluator = Evaluator()
+DECK = [r + s for r in "23456789TJQKA" for s in "cdhs"]
+
+
+def treys_rank(cards: list[str]) -> int:
+    return evaluator.evaluate([Card.new(c) for c in cards[:2]], [Card.new(c) for c in cards[2:]])
+
+
+def test_eval7_matches_treys():
+    rnd = random.Random(0)
+    for _ in range(20_000):
+        cards = rnd.sample(DECK, 7)
+        assert eval7(encode_cards(cards)) == treys_rank(cards), cards
+
+
+def test_river_equity_is_the_showdown_result():
+    # Nothing left to deal: every rollout is the same showdown
+    rnd = random.Random(1)
+    for _ in range(200):
+        cards = rnd.sample(DECK, 9)
+        hero, villain, board = cards[:2], cards[2:4], cards[4:]
+        a, b = treys_rank(hero + board), treys_rank(villain + board)
+        expected = 1.0 if a < b else 0.0 if a > b else 0.5
+        assert equity(hero, villain, board, n_iters=10) == expected
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+from treys import Card, Evaluator
+
+from poker_agent import hand_rank
+
+evaluator = Evaluator()
+DECK = [Card.new(r + s) for r in "23456789TJQKA" for s in "cdhs"]
+
+
+def test_hand_rank_matches_treys():
+    # Goes through the C evaluator when it is built, Treys otherwise
+    rnd = random.Random(0)
+    for size in (5, 6, 7):
+        for _ in range(10_000):
+            cards = rnd.sample(DECK, size)
+            assert hand_rank(cards[2:], cards[:2]) == evaluator.evaluate(cards[2:], cards[:2]), cards
+
+
+def test_c_eval7_matches_treys():
+    eval7 = pytest.importorskip("_eval7").eval7
+    rnd = random.Random(1)
+    for _ in range(30_000):
+        cards = rnd.sample(DECK, 7)
+        assert eval7(cards) == evaluator.evaluate(cards[:2], cards[2:]), cards
+
+
+@pytest.mark.parametrize("cards", [
+    [0xFFFF0000] * 7,                  # junk bits
+    [DECK[0]] * 7,                     # one card seven times
+    [DECK[0]] * 2 + DECK[10:15],       # a duplicate that still looks like a pair
+    [DECK[0] | 1 << 20] + DECK[10:16], # extra rank bit
+])
+def test_c_eval7_rejects_invalid_cards(cards):
+    eval7 = pytest.importorskip("_eval7").eval7
+    with pytest.raises(ValueError):
+        eval7(cards)
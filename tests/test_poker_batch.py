@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from poker_agent import PokerEngine, Phase
+from poker_batch import ACTIONS, DECK, PokerEngineBatch
+
+NUM_HANDS = 200
+MAX_STEPS = 60
+
+
+def assert_same_hand(engine: PokerEngine, batch: PokerEngineBatch, k: int):
+    scalar, vector = engine.serialize(), batch.serialize(k)
+    assert scalar["phase"] == vector["phase"]
+    assert scalar["community_cards"] == vector["community_cards"]
+    assert scalar["total_pot"] == vector["total_pot"]
+    for p, q in zip(scalar["players"], vector["players"]):
+        for field in ("stack", "committed", "is_folded", "is_all_in", "hole_cards"):
+            assert p[field] == q[field], (k, field)
+    if engine.phase != Phase.COMPLETED:
+        assert engine.current_actor_index == batch.current_actor[k]
+
+
+# Short (30) and deep (100) stacks, so all-in run-outs get covered too
+@pytest.mark.parametrize("num_players,stack", [(2, 100), (3, 30), (4, 100), (5, 30), (6, 100)])
+def test_batch_matches_engine(num_players, stack):
+    """Same decks and random actions: PokerEngineBatch must track
+    PokerEngine exactly (legal masks, stacks, boards, phases, actor)."""
+    player_ids = [f"p{i}" for i in range(num_players)]
+    engines, decks = [], []
+    for k in range(NUM_HANDS):
+        seed = f"batch-{num_players}-{k}"
+        engine = PokerEngine(player_ids, starting_stacks=[stack] * num_players)
+        engine.start_hand(deck_seed=seed)
+        engines.append(engine)
+        decks.append([DECK.index(c) for c in PokerEngine.shuffle_with_seed(seed)])
+
+    batch = PokerEngineBatch(NUM_HANDS, num_players, starting_stack=stack)
+    batch.start_hands(decks=np.array(decks, dtype=np.int8))
+    rnd = random.Random(num_players)
+
+    for _ in range(MAX_STEPS):
+        for k, engine in enumerate(engines):
+            assert_same_hand(engine, batch, k)
+        if all(e.phase == Phase.COMPLETED for e in engines):
+            break
+
+        mask = batch.legal_mask()
+        actions = np.zeros(NUM_HANDS, dtype=np.intp)
+        amounts = np.zeros(NUM_HANDS, dtype=np.int32)
+        for k, engine in enumerate(engines):
+            if engine.phase == Phase.COMPLETED:
+                assert not mask[k].any()
+                continue
+            pid = engine.players[engine.current_actor_index].player_id
+            legal = engine.legal_actions(pid)
+            assert legal == [ACTIONS[i] for i in np.flatnonzero(mask[k])]
+
+            action, amount = rnd.choice(legal), rnd.choice([0, 3, 10, 500])
+            engine.apply_action(pid, action, amount)
+            actions[k], amounts[k] = ACTIONS.index(action), amount
+        batch.apply_actions(actions, amounts)
+
+    assert all(e.phase == Phase.COMPLETED for e in engines)